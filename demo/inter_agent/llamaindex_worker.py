@@ -6,12 +6,31 @@ requests delegated from the LangChain agent via NLIP protocol.
 """
 
 import asyncio
+import atexit
+import functools
+import json
+import logging
+import logging.handlers
 import os
-from typing import Any, Dict, List, Optional
+import queue
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Final, List, Optional, Tuple
 from dotenv import load_dotenv
 
-from llama_index.core.tools import FunctionTool
-from llama_index.core.agent.workflow import FunctionAgent
+import httpx
+
+from llama_index.core.callbacks import CallbackManager
+from llama_index.core.tools import FunctionTool, ToolMetadata
+from llama_index.core.agent.workflow import (
+    AgentOutput,
+    AgentStream,
+    FunctionAgent,
+    ToolCall,
+    ToolCallResult,
+)
 from llama_index.core.workflow import Context
 from llama_index.llms.openai_like import OpenAILike
 
@@ -21,133 +40,594 @@ from nlip_sdk import nlip
 from nlip_server import server
 
 # Import shared utilities
-from ..shared.weather_tools import get_weather_alerts, get_weather_forecast
+from ..shared.indexed_memory import IndexedMemory
+from ..shared.response_cache import ResponseCache, SemanticResponseCache
+from ..shared.weather_tools import (
+    create_nws_client,
+    get_weather_alerts,
+    get_weather_forecast,
+    set_nws_client,
+)
 
 # Load environment variables
 load_dotenv()
 
+# Log records are handed to a queue and written by a background listener thread,
+# so request handlers never block the event loop on stdout I/O. The listener runs
+# for the life of the process, so records logged before the application starts
+# (or from the standalone demo) are written too.
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Read once at import; the application validates it before accepting connections
+_API_KEY = os.getenv("OPENROUTER_API_KEY")
+
+MODEL = os.getenv("OPENROUTER_MODEL", "anthropic/claude-3.5-sonnet")
+
+# llama-index sizes the agent's chat memory (and its token-count truncation) from the
+# context window. Unless overridden, the worker reads the real value for MODEL from
+# the OpenRouter model catalog at startup and falls back to the default below.
+DEFAULT_CONTEXT_WINDOW = 200000
+CONTEXT_WINDOW_OVERRIDE = os.getenv("OPENROUTER_CONTEXT_WINDOW")
+# Startup waits on the catalog lookup, so don't give it the client's full timeout
+CATALOG_TIMEOUT = 5.0
+
+SYSTEM_PROMPT: Final[str] = (
+    "You are a specialized weather agent. You execute weather-related tasks "
+    "that are delegated to you by other agents. You have direct access to weather APIs "
+    "and can provide detailed weather alerts and forecasts. When a request needs several "
+    "independent tool calls, make them all in the same turn. Always provide complete, "
+    "accurate information based on the tool results."
+)
+
+ALERTS_TOOL_DESCRIPTION: Final[str] = (
+    "Get weather alerts for a US state. Takes a state code like 'CA', 'NY', 'IN'."
+)
+FORECAST_TOOL_DESCRIPTION: Final[str] = (
+    "Get weather forecast for coordinates. Takes latitude and longitude as numbers."
+)
+MEMORY_TOOL_DESCRIPTION: Final[str] = (
+    "Fetch the full transcript of an earlier turn in this conversation by its memory "
+    "index, e.g. 'mem-12'."
+)
+
+
+OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP/2 client shared by all sessions of a worker process."""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        timeout=60.0,
+    )
+
+
+def _create_llm(
+    api_key: Optional[str],
+    http_client: Optional[httpx.AsyncClient] = None,
+    context_window: int = DEFAULT_CONTEXT_WINDOW,
+) -> OpenAILike:
+    """Create the Claude model client via OpenRouter."""
+    return OpenAILike(
+        model=MODEL,
+        api_key=api_key,
+        api_base=OPENROUTER_API_BASE,
+        temperature=0.7,
+        context_window=context_window,
+        is_chat_model=True,
+        is_function_calling_model=True,
+        async_http_client=http_client,
+        # Don't inherit global callback handlers (e.g. token counting) on every call
+        callback_manager=CallbackManager([]),
+    )
+
+
+async def _fetch_context_window(http_client: httpx.AsyncClient) -> Optional[int]:
+    """Look up MODEL's context length in the OpenRouter model catalog."""
+    try:
+        response = await http_client.get(
+            f"{OPENROUTER_API_BASE}/models", timeout=CATALOG_TIMEOUT
+        )
+        response.raise_for_status()
+        for entry in response.json().get("data", []):
+            if entry.get("id") == MODEL:
+                return entry.get("context_length")
+        logger.warning("Model %s not found in the OpenRouter catalog", MODEL)
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Could not read the OpenRouter model catalog: %s", e)
+    return None
+
+
+@dataclass
+class FrozenToolMetadata(ToolMetadata):
+    """ToolMetadata whose parameters schema is generated once and served from JSON.
+
+    The LLM serializes every tool's schema on each call; decoding the cached JSON
+    skips Pydantic's JSON Schema generation and still hands out a fresh dict, since
+    the OpenAI LLM mutates the tool specs it builds.
+    """
+
+    parameters_json: str = ""
+
+    def get_parameters_dict(self) -> dict:
+        return json.loads(self.parameters_json)
+
+
+def _frozen_tool(fn: Any, name: str, description: str) -> FunctionTool:
+    """Create a FunctionTool whose parameters schema is precomputed at import time."""
+    metadata = FunctionTool.from_defaults(fn=fn, name=name, description=description).metadata
+    frozen_metadata = FrozenToolMetadata(
+        name=metadata.name,
+        description=metadata.description,
+        fn_schema=metadata.fn_schema,
+        return_direct=metadata.return_direct,
+        parameters_json=json.dumps(metadata.get_parameters_dict()),
+    )
+    return FunctionTool.from_defaults(fn=fn, tool_metadata=frozen_metadata)
+
+
+# Finished turns of NLIP conversations are stored out of context and referenced
+# from the prompt by index. The database is opened at application startup.
+MEMORY_DB_PATH = os.getenv("MEMORY_DB_PATH", "./nlip_cache/indexed_memory.db")
+
+_memory = IndexedMemory(MEMORY_DB_PATH, max_entries_per_conversation=64, ttl=7 * 24 * 3600)
+
+
+async def fetch_memory(ctx: Context, index: str) -> str:
+    """Fetch the full transcript of an earlier conversation turn.
+    
+    Args:
+        ctx: The agent run's workflow Context, injected by the agent
+        index: Memory index from the conversation summary (e.g. mem-12)
+    """
+    # Only turns of the conversation this run belongs to can be dereferenced
+    conversation_id = await ctx.store.get("conversation_id", default=None)
+    transcript = None
+    if conversation_id is not None:
+        transcript = await _memory.fetch(conversation_id, index)
+    return transcript or f"No memory stored under {index}."
+
+
+def _with_memory_summary(text: str, summary: str) -> str:
+    """Prefix a query with the indexed summary of earlier turns, if there are any."""
+    if not summary:
+        return text
+    return (
+        "Earlier turns in this conversation (call fetch_memory with an index for details):\n"
+        f"{summary}\n\n"
+        f"Current request: {text}"
+    )
+
+
+# Tool wrappers are immutable, so build them once instead of per session
+_TOOLS = [
+    _frozen_tool(get_weather_alerts, "get_weather_alerts", ALERTS_TOOL_DESCRIPTION),
+    _frozen_tool(get_weather_forecast, "get_weather_forecast", FORECAST_TOOL_DESCRIPTION),
+]
+
+# Only runs within an NLIP conversation have earlier turns to fetch; everything else
+# gets an agent without the memory tool, so its schema isn't sent on every LLM call
+_CONVERSATION_TOOLS = [
+    *_TOOLS,
+    _frozen_tool(fetch_memory, "fetch_memory", MEMORY_TOOL_DESCRIPTION),
+]
+
+_TOOL_NAMES = [tool.metadata.name for tool in _CONVERSATION_TOOLS]
+
+
+def _create_agent(
+    llm: OpenAILike, tools: List[FunctionTool] = _TOOLS, verbose: bool = False
+) -> FunctionAgent:
+    """Create a weather FunctionAgent; a single instance serves all sessions."""
+    # Tool calls emitted in one turn become separate ToolCall events that the workflow's
+    # call_tool step (4 workers) runs concurrently, so alerts + forecast take max(), not sum()
+    return FunctionAgent(
+        tools=tools,
+        llm=llm,
+        allow_parallel_tool_calls=True,
+        verbose=verbose,
+        system_prompt=SYSTEM_PROMPT,
+    )
+
+
+# Cap concurrent agent runs against OpenRouter just below the provider rate limit,
+# rather than letting bursts trigger 429 retry storms
+OPENROUTER_MAX_CONCURRENCY = int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "16"))
+
+_llm_semaphore = asyncio.Semaphore(OPENROUTER_MAX_CONCURRENCY)
+
+# Cached answers are only valid for the model and system prompt that produced them
+_CACHE_NAMESPACE = MODEL.encode() + b"|" + SYSTEM_PROMPT.encode()
+
+# Exact-match cache of final responses for repeated delegated queries
+_response_cache = ResponseCache(_CACHE_NAMESPACE, maxsize=1024, ttl=3600)
+
+
+# Persistent semantic cache for differently phrased versions of the same query.
+# Its faiss index is per process, so it supports a single worker only; set
+# SEMANTIC_CACHE_DIR to an empty string to disable it when running --workers N.
+SEMANTIC_CACHE_DIR = os.getenv("SEMANTIC_CACHE_DIR", "./nlip_cache")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+
+_semantic_cache = SemanticResponseCache(
+    SEMANTIC_CACHE_DIR,
+    _CACHE_NAMESPACE,
+    similarity_threshold=SEMANTIC_CACHE_THRESHOLD,
+    ttl=3600,
+    max_size=1000,
+)
+
+
+# Delegations from the coordinator have a fixed shape ("Get weather alerts for CA",
+# "Get weather forecast for latitude X and longitude Y"). Queries that are exactly
+# one of these call the tool directly and skip the LLM round-trip; anything else,
+# including compound requests, goes to the agent.
+_ALERTS_RE = re.compile(
+    r"(?:get\s+)?(?:the\s+)?weather\s+alerts?\s+(?:for|in)\s+([a-z]{2})\s*[?.!]?",
+    re.IGNORECASE,
+)
+_FORECAST_RE = re.compile(
+    r"(?:get\s+)?(?:the\s+)?(?:weather\s+)?forecast\s+for\s+"
+    r"lat(?:itude)?\s*(-?\d+(?:\.\d+)?)\s*,?\s*(?:and\s+)?"
+    r"lon(?:gitude)?\s*(-?\d+(?:\.\d+)?)\s*[?.!]?",
+    re.IGNORECASE,
+)
+_US_STATE_CODES = frozenset(
+    "AL AK AZ AR CA CO CT DE FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO MT NE "
+    "NV NH NJ NM NY NC ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY "
+    "DC PR GU AS VI MP".split()
+)
+
+
+async def _route_direct(text: str) -> Optional[str]:
+    """Answer a delegation with a fixed shape by calling its weather tool directly."""
+    query = text.strip()
+    match = _ALERTS_RE.fullmatch(query)
+    if match and match.group(1).upper() in _US_STATE_CODES:
+        return await get_weather_alerts(match.group(1))
+    match = _FORECAST_RE.fullmatch(query)
+    if match:
+        return await get_weather_forecast(float(match.group(1)), float(match.group(2)))
+    return None
+
+
+# The weather tools report failures in their return value instead of raising
+_TOOL_ERROR_PREFIXES = ("❌", "Unable to fetch")
+
+
+def _is_failed_tool_call(result: ToolCallResult) -> bool:
+    """Whether a tool call made during an agent run failed."""
+    if result.tool_output.is_error:
+        return True
+    return str(result.tool_output.content).lstrip().startswith(_TOOL_ERROR_PREFIXES)
+
+
+def _cached_prompt_tokens(raw: Any) -> Optional[int]:
+    """Extract the number of prompt tokens served from the provider cache, if reported.
+
+    No cache_control breakpoint is set: the system prompt plus tool schemas are about
+    330 tokens, below Anthropic's 1024-token minimum cacheable prefix for Sonnet.
+    Providers that cache prompts automatically still report cache reads here.
+    """
+    usage = raw.get("usage") if isinstance(raw, dict) else getattr(raw, "usage", None)
+    if usage is None:
+        return None
+    details = (
+        usage.get("prompt_tokens_details")
+        if isinstance(usage, dict)
+        else getattr(usage, "prompt_tokens_details", None)
+    )
+    if details is None:
+        return None
+    if isinstance(details, dict):
+        return details.get("cached_tokens")
+    return getattr(details, "cached_tokens", None)
+
+
+# Workflow Contexts are kept per NLIP conversation and reused across its turns, so
+# repeat callers skip re-initializing the run state (memory buffer, state store).
+# Requests without a conversation token, and new conversations, take an idle Context
+# from a warm pool instead. Conversation history itself comes from the indexed
+# memory summary, so a Context's chat memory is cleared after each run; that also
+# makes it safe to hand to an unrelated request.
+CONTEXT_POOL_SIZE = 256
+WARM_CONTEXT_POOL_SIZE = OPENROUTER_MAX_CONCURRENCY
+
+
+class ContextPool:
+    """Idle workflow Contexts of one agent (a Context is bound to its workflow)."""
+
+    def __init__(
+        self,
+        agent: FunctionAgent,
+        size: int = CONTEXT_POOL_SIZE,
+        warm_size: int = WARM_CONTEXT_POOL_SIZE,
+    ):
+        self.agent = agent
+        self.size = size
+        self.warm_size = warm_size
+        self._contexts: "OrderedDict[str, Context]" = OrderedDict()
+        self._warm: List[Context] = []
+
+    def checkout(self, conversation_id: Optional[str]) -> Context:
+        """Take a conversation's pooled Context, else a warm idle one, else a new one.
+
+        The Context is removed from the pool while in use, so concurrent requests in
+        the same conversation never share a running Context.
+        """
+        ctx = self._contexts.pop(conversation_id, None) if conversation_id is not None else None
+        if ctx is None and self._warm:
+            ctx = self._warm.pop()
+        return ctx if ctx is not None else Context(self.agent)
+
+    async def checkin(self, conversation_id: Optional[str], ctx: Context):
+        """Return a Context after a successful run.
+
+        A conversation's Context is pooled under its token, evicting the least
+        recently used conversation; Contexts without a conversation go back to the
+        warm pool. If concurrent runs of one conversation both check in, the one
+        pooled first is displaced to the warm pool.
+        """
+        memory = await ctx.store.get("memory", default=None)
+        if memory is not None:
+            await memory.areset()
+        if conversation_id is None:
+            self.release(ctx)
+            return
+        displaced = self._contexts.pop(conversation_id, None)
+        if displaced is not None:
+            self.release(displaced)
+        self._contexts[conversation_id] = ctx
+        while len(self._contexts) > self.size:
+            _, evicted = self._contexts.popitem(last=False)
+            self.release(evicted)
+
+    def release(self, ctx: Context):
+        """Keep an idle Context in the warm pool if it has room, else drop it."""
+        if len(self._warm) < self.warm_size:
+            self._warm.append(ctx)
+
+
+async def _run_streamed(
+    agent: FunctionAgent, text: str, ctx: Context
+) -> Tuple[AgentOutput, bool]:
+    """Run the agent while consuming its event stream as the model generates it.
+
+    FunctionAgent streams completions from the LLM and dispatches tool calls as soon
+    as the streamed message ends. NLIP replies are a single message, so deltas are
+    not forwarded; draining the stream keeps per-token events from piling up in the
+    run's Context until completion, and traces first-token and tool latency.
+    Concurrent runs are capped by ``OPENROUTER_MAX_CONCURRENCY``.
+
+    Returns the agent output and whether any tool call in the run failed.
+    """
+    async with _llm_semaphore:
+        started = time.perf_counter()
+        first_token_seen = False
+        tool_failed = False
+        handler = agent.run(text, ctx=ctx)
+        try:
+            async for event in handler.stream_events():
+                if isinstance(event, AgentStream) and event.delta and not first_token_seen:
+                    first_token_seen = True
+                    logger.debug("First token after %.3fs", time.perf_counter() - started)
+                elif isinstance(event, ToolCallResult):
+                    tool_failed = tool_failed or _is_failed_tool_call(event)
+                    logger.debug(
+                        "Tool %s finished after %.3fs (error=%s)",
+                        event.tool_name,
+                        time.perf_counter() - started,
+                        event.tool_output.is_error,
+                    )
+                elif isinstance(event, ToolCall):
+                    logger.debug("Dispatching tool %s(%s)", event.tool_name, event.tool_kwargs)
+            return await handler, tool_failed
+        except asyncio.CancelledError:
+            # The workflow runs in its own task; stop it before the slot is released
+            await handler.cancel_run()
+            raise
+
 
 class LlamaIndexApplication(server.NLIP_Application):
     """LlamaIndex application for inter-agent communication."""
     
+    def __init__(self):
+        super().__init__()
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.llm: Optional[OpenAILike] = None
+        self.agent: Optional[FunctionAgent] = None
+        self.conversation_agent: Optional[FunctionAgent] = None
+        self.contexts: Optional[ContextPool] = None
+        self.conversation_contexts: Optional[ContextPool] = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self._nws_client: Optional[httpx.AsyncClient] = None
+
     async def startup(self):
-        print("🔧 Starting LlamaIndex Agent...")
-        print("This agent executes weather tools for requests delegated via NLIP protocol")
+        logger.info("Starting LlamaIndex Agent")
+        logger.info("This agent executes weather tools for requests delegated via NLIP protocol")
+        if not _API_KEY:
+            raise ValueError("OPENROUTER_API_KEY environment variable is required. Get your key from https://openrouter.ai/")
+        logger.debug("Using OpenRouter API key: %s...", _API_KEY[:10])
+        # Build the connection pool, LLM and agent per worker process: sockets and
+        # event-loop-bound clients can't be shared safely across uvicorn workers
+        self.http_client = _create_http_client()
+        if CONTEXT_WINDOW_OVERRIDE:
+            context_window = int(CONTEXT_WINDOW_OVERRIDE)
+            # Pre-warm the TLS session to OpenRouter in the background
+            self._prewarm_task = asyncio.create_task(_prewarm_connection(self.http_client))
+        else:
+            # The catalog request also opens the keep-alive connection to OpenRouter
+            context_window = (
+                await _fetch_context_window(self.http_client) or DEFAULT_CONTEXT_WINDOW
+            )
+        logger.info("Using %s with a %d token context window", MODEL, context_window)
+        self.llm = _create_llm(_API_KEY, self.http_client, context_window)
+        self.agent = _create_agent(self.llm)
+        self.conversation_agent = _create_agent(self.llm, _CONVERSATION_TOOLS)
+        self.contexts = ContextPool(self.agent)
+        self.conversation_contexts = ContextPool(self.conversation_agent)
+        await asyncio.to_thread(_memory.open)
+        # Share one keep-alive NWS API client across all weather tool calls
+        self._nws_client = create_nws_client()
+        set_nws_client(self._nws_client)
+        # Loading the embedding model blocks, so keep it off the event loop. The
+        # cache is only an optimization; without it every miss goes to the agent.
+        if not SEMANTIC_CACHE_DIR:
+            logger.info("Semantic cache disabled (SEMANTIC_CACHE_DIR is empty)")
+        else:
+            try:
+                await asyncio.to_thread(_semantic_cache.init)
+            except Exception as e:
+                logger.warning("Semantic cache disabled, could not initialize it: %s", e)
 
     async def shutdown(self):
-        print("🛑 Shutting down LlamaIndex Agent")
+        logger.info("Shutting down LlamaIndex Agent")
+        if self._prewarm_task is not None and not self._prewarm_task.done():
+            self._prewarm_task.cancel()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+        if self._nws_client is not None:
+            set_nws_client(None)
+            await self._nws_client.aclose()
+        _memory.close()
         return None
 
     async def create_session(self) -> server.NLIP_Session:
-        return LlamaIndexSession()
+        return LlamaIndexSession(self)
+
+
+async def _prewarm_connection(http_client: httpx.AsyncClient):
+    """Open a keep-alive connection to OpenRouter before the first delegated request."""
+    try:
+        await http_client.head(f"{OPENROUTER_API_BASE}/models")
+    except httpx.HTTPError as e:
+        logger.warning("Could not pre-warm OpenRouter connection: %s", e)
 
 
 class LlamaIndexSession(server.NLIP_Session):
     """Chat session using LlamaIndex with actual tool implementations."""
     
-    def __init__(self):
+    def __init__(self, app: LlamaIndexApplication):
         super().__init__()
-        self.llm = None
+        self.app = app
+        self.llm = app.llm
         self.agent = None
         self.tools = []
-        self.context = None
 
     async def start(self):
         """Initialize LlamaIndex components for tool execution."""
         try:
-            print("🔧 Initializing LlamaIndex components...")
+            logger.debug("Initializing LlamaIndex components")
             
-            # Check for API key
-            api_key = os.getenv("OPENROUTER_API_KEY")
-            if not api_key:
-                raise ValueError("OPENROUTER_API_KEY environment variable is required. Get your key from https://openrouter.ai/")
+            # Reuse the tools and agent built once per worker process
+            self.tools = _TOOLS
+            self.agent = self.app.agent
             
-            print(f"🔑 Using OpenRouter API key: {api_key[:10]}...")
-            
-            # Initialize Claude model via OpenRouter
-            self.llm = OpenAILike(
-                model="anthropic/claude-3.5-sonnet",
-                api_key=api_key,
-                api_base="https://openrouter.ai/api/v1",
-                temperature=0.7,
-                context_window=200000,
-                is_chat_model=True,
-                is_function_calling_model=True,
-            )
-            
-            # Create FunctionTool objects from our async functions
-            self.tools = [
-                FunctionTool.from_defaults(
-                    fn=get_weather_alerts,
-                    name="get_weather_alerts",
-                    description="Get weather alerts for a US state. Takes a state code like 'CA', 'NY', 'IN'."
-                ),
-                FunctionTool.from_defaults(
-                    fn=get_weather_forecast,
-                    name="get_weather_forecast", 
-                    description="Get weather forecast for coordinates. Takes latitude and longitude as numbers."
-                ),
-            ]
-            
-            # Create LlamaIndex FunctionAgent
-            self.agent = FunctionAgent(
-                tools=self.tools,
-                llm=self.llm,
-                verbose=True,
-                system_prompt=(
-                    "You are a specialized weather agent. You execute weather-related tasks "
-                    "that are delegated to you by other agents. You have direct access to weather APIs "
-                    "and can provide detailed weather alerts and forecasts. Always provide complete, "
-                    "accurate information based on the tool results."
-                )
-            )
-            
-            # Initialize context for maintaining conversation state
-            self.context = Context(self.agent)
-            
-            print("✅ LlamaIndex components initialized successfully.")
-            print(f"🛠️ Available weather tools: {[tool.metadata.name for tool in self.tools]}")
+            logger.debug("LlamaIndex components initialized, tools: %s", _TOOL_NAMES)
             
         except Exception as e:
-            print(f"❌ Error initializing LlamaIndex components: {e}")
+            logger.error("Error initializing LlamaIndex components: %s", e)
             raise
 
     async def execute(self, msg: nlip.NLIP_Message) -> nlip.NLIP_Message:
         """Execute delegated query using LlamaIndex agent with real tools."""
-        logger = self.get_logger()
         text = msg.extract_text()
+        # nlip_server creates a session per HTTP request, so earlier turns can only be
+        # tracked for callers that send an NLIP conversation token
+        conversation_id = msg.extract_conversation_token()
         
         try:
-            print(f"\n🔧 [LlamaIndex] Processing delegated query: {text}")
-            print("=" * 80)
+            logger.debug("Processing delegated query: %s", text)
             
-            # Reset context for fresh conversation
-            self.context = Context(self.agent)
-            
-            # Use the agent to process the query
-            response = await self.agent.run(text, ctx=self.context)
-            response_text = str(response)
+            response_text = await _route_direct(text)
+            if response_text is not None:
+                logger.debug("Answered by direct tool call, skipping the agent")
+            else:
+                # Refer to earlier turns by index instead of replaying the full history
+                summary = await _memory.summary(conversation_id) if conversation_id else ""
+                prompt = _with_memory_summary(text, summary)
+                
+                # Serve repeated queries from the caches, otherwise run the agent
+                response_text = await _response_cache.get_or_compute(
+                    prompt,
+                    functools.partial(
+                        self._answer, prompt, conversation_id, use_semantic_cache=not summary
+                    ),
+                )
+            if conversation_id:
+                await _memory.store(conversation_id, text, response_text)
             
-            print("=" * 80)
-            print(f"✅ [LlamaIndex] Completed processing, returning result to coordinator\n")
-            logger.info(f"LlamaIndex Response: {response_text}")
+            logger.debug("Completed processing, returning result to coordinator")
+            logger.info("LlamaIndex Response: %s", response_text)
             return NLIP_Factory.create_text(response_text)
             
         except Exception as e:
-            logger.error(f"Exception in LlamaIndex execution: {e}")
+            logger.error("Exception in LlamaIndex execution: %s", e)
             return NLIP_Factory.create_text(f"❌ Error processing delegated request: {str(e)}")
 
-    async def stop(self):
-        """Clean up resources."""
-        print("🛑 Stopping LlamaIndex session")
+    async def _answer(
+        self, text: str, conversation_id: Optional[str], use_semantic_cache: bool = True
+    ) -> Tuple[str, bool]:
+        """Answer a query from the semantic cache, falling back to the agent.
+
+        Prompts that carry an earlier-turns summary skip the semantic cache: a
+        similar prompt from another conversation can refer to different turns.
+
+        Returns the response and whether it may be cached.
+        """
+        if use_semantic_cache:
+            cached = await _semantic_cache.get(text)
+            if cached is not None:
+                logger.info("Semantic cache hit for delegated query")
+                return cached, True
+        
+        response_text, cacheable = await self._run_agent(text, conversation_id)
+        if cacheable and use_semantic_cache:
+            await _semantic_cache.put(text, response_text)
+        return response_text, cacheable
+
+    async def _run_agent(self, text: str, conversation_id: Optional[str]) -> Tuple[str, bool]:
+        """Run the agent on a query.
+
+        Returns the response and whether it may be cached, i.e. the agent answered
+        and none of the tool calls it made failed.
+        """
+        if conversation_id is None:
+            contexts = self.app.contexts
+        else:
+            contexts = self.app.conversation_contexts
+            
+        ctx = contexts.checkout(conversation_id)
+        await ctx.store.set("conversation_id", conversation_id)
+        response, tool_failed = await _run_streamed(contexts.agent, text, ctx)
+        await contexts.checkin(conversation_id, ctx)
+        
+        cached_tokens = _cached_prompt_tokens(response.raw)
+        if cached_tokens is not None:
+            logger.info("Prompt cache read tokens: %s", cached_tokens)
+        
+        # Only the final assistant message goes back to the coordinator
+        response_text = response.response.content or ""
+        return response_text, bool(response_text) and not tool_failed
 
     async def stop(self):
         """Clean up resources."""
-        print("🛑 Stopping LlamaIndex worker session")
+        logger.debug("Stopping LlamaIndex worker session")
         self.llm = None
         self.agent = None
         self.tools = []
-        self.context = None
 
 
 # Standalone demo function for testing
@@ -163,48 +643,16 @@ async def standalone_demo():
     print()
     
     # Check for API key
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    if not api_key:
+    if not _API_KEY:
         print("❌ ERROR: OPENROUTER_API_KEY environment variable is required!")
         print("Get your API key from: https://openrouter.ai/")
         print("Set it with: export OPENROUTER_API_KEY='your-key-here'")
         return
     
     # Initialize LlamaIndex components
-    llm = OpenAILike(
-        model="anthropic/claude-3.5-sonnet",
-        api_key=api_key,
-        api_base="https://openrouter.ai/api/v1",
-        temperature=0.7,
-        context_window=200000,
-        is_chat_model=True,
-        is_function_calling_model=True,
-    )
-    
-    tools = [
-        FunctionTool.from_defaults(
-            fn=get_weather_alerts,
-            name="get_weather_alerts",
-            description="Get weather alerts for a US state. Takes a state code like 'CA', 'NY', 'IN'."
-        ),
-        FunctionTool.from_defaults(
-            fn=get_weather_forecast,
-            name="get_weather_forecast", 
-            description="Get weather forecast for coordinates. Takes latitude and longitude as numbers."
-        ),
-    ]
-    
-    agent = FunctionAgent(
-        tools=tools,
-        llm=llm,
-        verbose=True,
-        system_prompt=(
-            "You are a specialized weather agent. You execute weather-related tasks "
-            "that are delegated to you by other agents. You have direct access to weather APIs "
-            "and can provide detailed weather alerts and forecasts. Always provide complete, "
-            "accurate information based on the tool results."
-        )
-    )
+    llm = _create_llm(_API_KEY)
+    tools = _TOOLS
+    agent = _create_agent(llm, verbose=True)
     
     context = Context(agent)
     
@@ -242,9 +690,20 @@ if __name__ == "__main__":
     import sys
     
     if len(sys.argv) > 1 and sys.argv[1] == "standalone":
-        # Run standalone demo
+        # Run standalone demo on the libuv-based event loop where it's available;
+        # uvloop isn't supported on Windows. Under uvicorn, pass --loop uvloop instead.
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
         asyncio.run(standalone_demo())
     else:
         print("🌟 LlamaIndex NLIP Server Ready!")
         print("This server executes weather tools for requests delegated from coordinator agents.")
         print("🚀 Start with: poetry run uvicorn demo.inter_agent.llamaindex_worker:app --host 0.0.0.0 --port 8013 --reload")
+        print(
+            "🏭 In production: poetry run uvicorn demo.inter_agent.llamaindex_worker:app "
+            "--host 0.0.0.0 --port 8013 --workers 4 --loop uvloop --http httptools"
+        )
@@ -0,0 +1,125 @@
+"""
+Indexed conversation memory for long-lived NLIP agent sessions.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class IndexedMemory:
+    """Compact in-context summary backed by an external key-value store.
+
+    Instead of replaying the full conversation history on every turn, each
+    finished turn is stored in SQLite under a stable index (e.g. ``mem-12``) and
+    only a one-line description per recent turn is put in the prompt. The agent
+    dereferences an index through a fetch tool when it needs the full transcript,
+    so the prompt size per turn stays bounded regardless of conversation length.
+
+    Storage is bounded too: a conversation keeps at most ``max_entries_per_conversation``
+    turns, and turns older than ``ttl`` seconds are dropped.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_summary_entries: int = 8,
+        description_chars: int = 100,
+        max_entries_per_conversation: int = 64,
+        ttl: float = 7 * 24 * 3600,
+    ):
+        self.db_path = db_path
+        self.max_summary_entries = max_summary_entries
+        self.description_chars = description_chars
+        self.max_entries_per_conversation = max_entries_per_conversation
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def open(self):
+        """Open (and if needed create) the database; call once before use."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " conversation_id TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " description TEXT NOT NULL,"
+                " transcript TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS memory_conversation ON memory (conversation_id, id)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS memory_created ON memory (created)")
+        with self._lock:
+            self._conn = conn
+
+    async def store(self, conversation_id: str, query: str, response: str) -> str:
+        """Store a finished turn and return its index."""
+        description = " ".join(query.split())[: self.description_chars]
+        transcript = f"User: {query}\nAgent: {response}"
+        row_id = await asyncio.to_thread(self._insert, conversation_id, description, transcript)
+        return f"mem-{row_id}"
+
+    async def fetch(self, conversation_id: str, index: str) -> Optional[str]:
+        """Return the transcript stored under an index, if it belongs to the conversation."""
+        prefix, _, row_id = index.strip().partition("-")
+        if prefix != "mem" or not row_id.isdigit():
+            return None
+        return await asyncio.to_thread(self._select_transcript, conversation_id, int(row_id))
+
+    async def summary(self, conversation_id: str) -> str:
+        """Return the in-context summary of the most recent turns of a conversation."""
+        rows = await asyncio.to_thread(self._select_recent, conversation_id)
+        if not rows:
+            return ""
+        lines = [f"[mem-{row_id}] {description}" for row_id, description in reversed(rows)]
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _insert(self, conversation_id: str, description: str, transcript: str) -> int:
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO memory (conversation_id, created, description, transcript)"
+                " VALUES (?, ?, ?, ?)",
+                (conversation_id, now, description, transcript),
+            )
+            # Prune on write: expired turns of any conversation, and this
+            # conversation's turns beyond its cap
+            self._conn.execute("DELETE FROM memory WHERE created < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM memory WHERE conversation_id = ? AND id NOT IN ("
+                " SELECT id FROM memory WHERE conversation_id = ? ORDER BY id DESC LIMIT ?)",
+                (conversation_id, conversation_id, self.max_entries_per_conversation),
+            )
+            return cursor.lastrowid
+
+    def _select_transcript(self, conversation_id: str, row_id: int) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT transcript FROM memory"
+                " WHERE id = ? AND conversation_id = ? AND created >= ?",
+                (row_id, conversation_id, time.time() - self.ttl),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _select_recent(self, conversation_id: str) -> List[Tuple[int, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, description FROM memory WHERE conversation_id = ? AND created >= ?"
+                " ORDER BY id DESC LIMIT ?",
+                (conversation_id, time.time() - self.ttl, self.max_summary_entries),
+            ).fetchall()
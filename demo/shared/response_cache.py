@@ -0,0 +1,203 @@
+"""
+Response caching for delegated NLIP queries.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from cachetools import TTLCache
+from gptcache import Cache
+from gptcache.adapter.api import init_similar_cache
+from gptcache.config import Config
+from gptcache.embedding import Onnx
+from gptcache.manager import manager_factory
+
+
+class ResponseCache:
+    """TTL'd exact-match cache for final agent responses.
+
+    Keys are ``sha256(namespace|text)`` where the namespace identifies everything
+    besides the query that determines the answer (model, system prompt). Concurrent
+    misses for the same key share one in-flight computation, so only one agent run
+    is made and every caller gets its result, whether or not it may be stored.
+    """
+
+    def __init__(self, namespace: Union[str, bytes], maxsize: int = 1024, ttl: float = 3600):
+        if isinstance(namespace, str):
+            namespace = namespace.encode()
+        # Hash the constant namespace once; each lookup only hashes the query
+        self._prefix = hashlib.sha256(namespace + b"|")
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # key -> (in-flight computation, number of callers waiting on it)
+        self._inflight: Dict[str, Tuple[asyncio.Task, int]] = {}
+
+    def key(self, text: str) -> str:
+        """Return the cache key for a query."""
+        digest = self._prefix.copy()
+        digest.update(text.encode())
+        return digest.hexdigest()
+
+    def get(self, text: str) -> Optional[str]:
+        """Return the cached response for a query, if present and not expired."""
+        return self._entries.get(self.key(text))
+
+    async def get_or_compute(
+        self, text: str, compute: Callable[[], Awaitable[Tuple[str, bool]]]
+    ) -> str:
+        """Return the cached response for a query, computing and storing it on a miss.
+
+        A caller that gives up is detached from the computation; it is cancelled
+        only when no caller is left waiting for it.
+
+        Args:
+            text: The query text
+            compute: Zero-argument coroutine function producing the response and
+                whether it may be stored (e.g. False if a tool call failed)
+        """
+        key = self.key(text)
+        cached = self._entries.get(key)
+        if cached is not None:
+            return cached
+
+        task, waiters = self._inflight.get(key, (None, 0))
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, compute))
+        self._inflight[key] = (task, waiters + 1)
+        cancelled = False
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if self._release(key, task) == 0 and cancelled:
+                task.cancel()
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Tuple[str, bool]]]) -> str:
+        try:
+            response, cacheable = await compute()
+            if cacheable:
+                self._entries[key] = response
+            return response
+        finally:
+            self._inflight.pop(key, None)
+
+    def _release(self, key: str, task: asyncio.Task) -> int:
+        """Detach a caller from an in-flight computation; return how many are left."""
+        current, waiters = self._inflight.get(key, (None, 0))
+        if current is not task:
+            return 0
+        self._inflight[key] = (task, waiters - 1)
+        return waiters - 1
+
+
+class SemanticResponseCache:
+    """Disk-backed semantic cache (GPTCache) for near-duplicate queries.
+
+    Queries are embedded and matched by vector similarity, so differently phrased
+    requests for the same information ("weather in Indiana" / "Indiana weather
+    alerts") can share one answer. Entries are persisted under a subdirectory of
+    ``data_dir`` named after the namespace (as for :class:`ResponseCache`) and
+    survive process restarts; expired entries are evicted when a lookup finds them.
+
+    The faiss index is held in process memory and written back on exit, so
+    processes sharing ``data_dir`` overwrite each other's entries. Use it from a
+    single worker process only.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        namespace: Union[str, bytes],
+        similarity_threshold: float = 0.95,
+        ttl: float = 3600,
+        max_size: int = 1000,
+        top_k: int = 5,
+    ):
+        if isinstance(namespace, str):
+            namespace = namespace.encode()
+        self.data_dir = os.path.join(data_dir, hashlib.sha256(namespace).hexdigest()[:16])
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self.top_k = top_k
+        self._cache: Optional[Cache] = None
+        # The faiss index and SQLite store are not safe for concurrent worker threads
+        self._lock = threading.Lock()
+
+    def init(self):
+        """Load the embedding model and open the on-disk store.
+
+        This is blocking (it may download the embedding model on first use), so
+        call it once at application startup, e.g. via ``asyncio.to_thread``.
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        embedding = Onnx()
+        cache = Cache()
+        init_similar_cache(
+            cache_obj=cache,
+            embedding=embedding,
+            data_manager=manager_factory(
+                "sqlite,faiss",
+                data_dir=self.data_dir,
+                max_size=self.max_size,
+                vector_params={"dimension": embedding.dimension},
+            ),
+            config=Config(similarity_threshold=self.similarity_threshold),
+        )
+        self._cache = cache
+
+    async def get(self, text: str) -> Optional[str]:
+        """Return the answer to a similar earlier query, if one is cached and fresh."""
+        if self._cache is None:
+            return None
+        embedding = await asyncio.to_thread(self._cache.embedding_func, text)
+        return await asyncio.to_thread(self._locked, self._lookup, embedding)
+
+    async def put(self, text: str, response: str):
+        """Store the answer for a query."""
+        if self._cache is None:
+            return
+        embedding = await asyncio.to_thread(self._cache.embedding_func, text)
+        entry = json.dumps({"created": time.time(), "text": response})
+        await asyncio.to_thread(
+            self._locked, self._cache.data_manager.save, text, entry, embedding
+        )
+
+    def _lookup(self, embedding) -> Optional[str]:
+        """Return the closest fresh answer, evicting expired entries on the way."""
+        data_manager = self._cache.data_manager
+        evaluation = self._cache.similarity_evaluation
+        min_rank, max_rank = evaluation.range()
+        rank_threshold = min_rank + (max_rank - min_rank) * self.similarity_threshold
+
+        response = None
+        expired = []
+        now = time.time()
+        # Results come nearest first; faiss pads missing neighbours with id -1
+        for result in data_manager.search(embedding, top_k=self.top_k) or []:
+            if evaluation.evaluation({}, {"search_result": result}) < rank_threshold:
+                break
+            cache_data = data_manager.get_scalar_data(result)
+            if cache_data is None:
+                continue
+            entry = json.loads(cache_data.answers[0].answer)
+            if now - entry["created"] > self.ttl:
+                expired.append(result[1])
+            elif response is None:
+                response = entry["text"]
+
+        if expired:
+            # Otherwise the oldest (expired) row keeps winning ties with its refreshed copy
+            data_manager.eviction_manager.soft_evict(expired)
+            data_manager.eviction_manager.delete()
+        return response
+
+    def _locked(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            return fn(*args, **kwargs)
@@ -4,7 +4,42 @@ These tools integrate with the National Weather Service API.
 """
 
 import httpx
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+NWS_API_BASE = "https://api.weather.gov"
+USER_AGENT = "nlip-agent-frameworks-demo/1.0"
+
+# Process-wide keep-alive client installed by long-running servers, so tool calls
+# reuse pooled connections to the NWS API instead of a new TCP+TLS handshake each
+_nws_client: Optional[httpx.AsyncClient] = None
+
+
+def create_nws_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP/2 client for the National Weather Service API."""
+    return httpx.AsyncClient(
+        base_url=NWS_API_BASE,
+        http2=True,
+        headers={"User-Agent": USER_AGENT, "Accept": "application/geo+json"},
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=20),
+    )
+
+
+def set_nws_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Install (or with None, remove) the shared client used by the weather tools."""
+    global _nws_client
+    _nws_client = client
+
+
+@asynccontextmanager
+async def _nws_session() -> AsyncIterator[httpx.AsyncClient]:
+    """Yield the shared NWS client, or a short-lived one if none is installed."""
+    if _nws_client is not None:
+        yield _nws_client
+    else:
+        async with create_nws_client() as client:
+            yield client
 
 
 async def get_weather_alerts(state: str) -> str:
@@ -16,15 +51,11 @@ async def get_weather_alerts(state: str) -> str:
     Returns:
         Formatted string with weather alerts or no alerts message
     """
-    NWS_API_BASE = "https://api.weather.gov"
-    USER_AGENT = "nlip-agent-frameworks-demo/1.0"
-    
-    headers = {"User-Agent": USER_AGENT, "Accept": "application/geo+json"}
-    url = f"{NWS_API_BASE}/alerts/active/area/{state.upper()}"
+    url = f"/alerts/active/area/{state.upper()}"
     
-    async with httpx.AsyncClient() as client:
+    async with _nws_session() as client:
         try:
-            response = await client.get(url, headers=headers, timeout=30.0)
+            response = await client.get(url)
             response.raise_for_status()
             data = response.json()
             
@@ -62,22 +93,17 @@ async def get_weather_forecast(latitude: float, longitude: float) -> str:
     Returns:
         Formatted string with weather forecast
     """
-    NWS_API_BASE = "https://api.weather.gov"
-    USER_AGENT = "nlip-agent-frameworks-demo/1.0"
-    
-    headers = {"User-Agent": USER_AGENT, "Accept": "application/geo+json"}
-    
-    async with httpx.AsyncClient() as client:
+    async with _nws_session() as client:
         try:
             # First get the forecast grid endpoint
-            points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-            points_response = await client.get(points_url, headers=headers, timeout=30.0)
+            points_url = f"/points/{latitude},{longitude}"
+            points_response = await client.get(points_url)
             points_response.raise_for_status()
             points_data = points_response.json()
 
             # Get the forecast URL from the points response
             forecast_url = points_data["properties"]["forecast"]
-            forecast_response = await client.get(forecast_url, headers=headers, timeout=30.0)
+            forecast_response = await client.get(forecast_url)
             forecast_response.raise_for_status()
             forecast_data = forecast_response.json()
 
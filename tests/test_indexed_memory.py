@@ -0,0 +1,80 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from demo.shared.indexed_memory import IndexedMemory
+
+
+@pytest.fixture
+def memory(tmp_path):
+    memory = IndexedMemory(
+        str(tmp_path / "memory.db"), max_summary_entries=2, max_entries_per_conversation=3
+    )
+    memory.open()
+    yield memory
+    memory.close()
+
+
+async def test_fetch_returns_transcript_of_own_conversation(memory):
+    index = await memory.store("a", "alerts for CA", "none")
+
+    assert await memory.fetch("a", index) == "User: alerts for CA\nAgent: none"
+
+
+async def test_fetch_does_not_cross_conversations(memory):
+    index = await memory.store("a", "alerts for CA", "none")
+
+    assert await memory.fetch("b", index) is None
+
+
+async def test_fetch_rejects_malformed_index(memory):
+    await memory.store("a", "alerts for CA", "none")
+
+    assert await memory.fetch("a", "1") is None
+    assert await memory.fetch("a", "mem-x") is None
+
+
+async def test_summary_lists_recent_turns_of_conversation(memory):
+    await memory.store("a", "first", "1")
+    second = await memory.store("a", "second", "2")
+    third = await memory.store("a", "third", "3")
+    await memory.store("b", "other", "4")
+
+    assert await memory.summary("a") == f"[{second}] second\n[{third}] third"
+
+
+async def test_store_keeps_at_most_max_entries_per_conversation(memory):
+    indices = [await memory.store("a", f"turn {i}", str(i)) for i in range(5)]
+    await memory.store("b", "other", "x")
+
+    assert await memory.fetch("a", indices[1]) is None
+    assert await memory.fetch("a", indices[2]) is not None
+    rows = sqlite3.connect(memory.db_path).execute(
+        "SELECT conversation_id, COUNT(*) FROM memory GROUP BY conversation_id"
+    )
+    assert dict(rows.fetchall()) == {"a": 3, "b": 1}
+
+
+async def test_expired_turns_are_hidden_and_pruned(tmp_path):
+    memory = IndexedMemory(str(tmp_path / "memory.db"), ttl=0.05)
+    memory.open()
+    try:
+        index = await memory.store("a", "alerts for CA", "none")
+        await asyncio.sleep(0.1)
+
+        assert await memory.fetch("a", index) is None
+        assert await memory.summary("a") == ""
+
+        await memory.store("b", "alerts for NY", "none")
+        count = sqlite3.connect(memory.db_path).execute("SELECT COUNT(*) FROM memory")
+        assert count.fetchone() == (1,)
+    finally:
+        memory.close()
+
+
+def test_database_is_not_created_until_opened(tmp_path):
+    db_path = tmp_path / "cache" / "memory.db"
+    IndexedMemory(str(db_path))
+
+    assert not db_path.parent.exists()
@@ -0,0 +1,202 @@
+import pytest
+from llama_index.core.agent.workflow import ToolCallResult
+from llama_index.core.llms import ChatMessage
+from llama_index.core.memory import ChatMemoryBuffer
+from llama_index.core.tools import ToolOutput
+
+from demo.inter_agent import llamaindex_worker as worker
+
+
+@pytest.fixture
+def tool_calls(monkeypatch):
+    calls = []
+
+    async def get_weather_alerts(state):
+        calls.append(("alerts", state))
+        return f"alerts for {state}"
+
+    async def get_weather_forecast(latitude, longitude):
+        calls.append(("forecast", latitude, longitude))
+        return f"forecast for {latitude}, {longitude}"
+
+    monkeypatch.setattr(worker, "get_weather_alerts", get_weather_alerts)
+    monkeypatch.setattr(worker, "get_weather_forecast", get_weather_forecast)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        # Exact phrasings sent by the LangChain coordinator
+        ("Get weather alerts for CA", ("alerts", "CA")),
+        (
+            "Get weather forecast for latitude 39.1 and longitude -86.5",
+            ("forecast", 39.1, -86.5),
+        ),
+        ("Get weather forecast for latitude 39 and longitude -86", ("forecast", 39.0, -86.0)),
+        # Harmless variations of the same shape
+        ("  get weather alerts in ny?  ", ("alerts", "ny")),
+        ("Weather alert for IN.", ("alerts", "IN")),
+        ("forecast for lat 40.7, lon -74.0", ("forecast", 40.7, -74.0)),
+    ],
+)
+async def test_route_direct_calls_tool_for_fixed_shapes(tool_calls, query, expected):
+    assert await worker._route_direct(query) is not None
+    assert tool_calls == [expected]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        # Compound requests need the agent to make several calls
+        "Get weather alerts for CA and NY",
+        "Get weather alerts for CA and the forecast for latitude 39.1 and longitude -86.5",
+        "Get weather forecast for latitude 39.1 and longitude -86.5, then alerts for IN",
+        # Free-form requests need the agent to resolve places
+        "Get weather alerts for California",
+        "What's the weather forecast for Bloomington, Indiana?",
+        "Are there any weather alerts for CA right now?",
+        "Get weather forecast for Denver",
+        # Two letters that aren't a state code
+        "Get weather alerts for XX",
+        "",
+    ],
+)
+async def test_route_direct_falls_through(tool_calls, query):
+    assert await worker._route_direct(query) is None
+    assert tool_calls == []
+
+
+@pytest.mark.parametrize(
+    "query, matches",
+    [
+        ("Get weather alerts for CA", True),
+        ("weather alerts in tx", True),
+        ("Get weather alerts for CAL", False),
+        ("Get alerts for CA", False),
+    ],
+)
+def test_alerts_re(query, matches):
+    assert bool(worker._ALERTS_RE.fullmatch(query)) is matches
+
+
+@pytest.mark.parametrize(
+    "query, matches",
+    [
+        ("Get weather forecast for latitude 39.1 and longitude -86.5", True),
+        ("forecast for latitude -33.9 longitude 151.2", True),
+        ("Get weather forecast for latitude 39.1", False),
+        ("Get weather forecast for longitude -86.5 and latitude 39.1", False),
+    ],
+)
+def test_forecast_re(query, matches):
+    assert bool(worker._FORECAST_RE.fullmatch(query)) is matches
+
+
+def _tool_result(content, is_error=False):
+    return ToolCallResult(
+        tool_name="get_weather_alerts",
+        tool_kwargs={"state": "CA"},
+        tool_id="call-1",
+        tool_output=ToolOutput(
+            content=content,
+            tool_name="get_weather_alerts",
+            raw_input={},
+            raw_output=content,
+            is_error=is_error,
+        ),
+        return_direct=False,
+    )
+
+
+@pytest.mark.parametrize(
+    "content, is_error, failed",
+    [
+        ("No active weather alerts for CA.", False, False),
+        ("Flood Watch for Los Angeles County", False, False),
+        ("❌ Error fetching alerts: timeout", False, True),
+        ("  ❌ Error fetching forecast", False, True),
+        ("Unable to fetch forecast data for this location.", False, True),
+        ("Tool raised an exception", True, True),
+    ],
+)
+def test_is_failed_tool_call(content, is_error, failed):
+    assert worker._is_failed_tool_call(_tool_result(content, is_error)) is failed
+
+
+@pytest.fixture(scope="module")
+def agent():
+    return worker._create_agent(worker._create_llm("test-key"))
+
+
+async def test_context_pool_reuses_conversation_context(agent):
+    pool = worker.ContextPool(agent)
+
+    ctx = pool.checkout("conv-1")
+    await pool.checkin("conv-1", ctx)
+
+    assert pool.checkout("conv-1") is ctx
+
+
+async def test_context_pool_checkout_removes_context_while_in_use(agent):
+    pool = worker.ContextPool(agent)
+    ctx = pool.checkout("conv-1")
+    await pool.checkin("conv-1", ctx)
+
+    assert pool.checkout("conv-1") is ctx
+    assert pool.checkout("conv-1") is not ctx
+
+
+async def test_context_pool_warm_context_serves_other_requests(agent):
+    pool = worker.ContextPool(agent)
+    ctx = pool.checkout(None)
+    await pool.checkin(None, ctx)
+
+    assert pool.checkout("new-conversation") is ctx
+    assert pool.checkout(None) is not ctx
+
+
+async def test_context_pool_releases_displaced_context(agent):
+    pool = worker.ContextPool(agent)
+    first, second = pool.checkout("conv-1"), pool.checkout("conv-1")
+
+    await pool.checkin("conv-1", first)
+    await pool.checkin("conv-1", second)
+
+    assert pool.checkout("conv-1") is second
+    assert pool.checkout(None) is first
+
+
+async def test_context_pool_evicts_least_recently_used_conversation(agent):
+    pool = worker.ContextPool(agent, size=2, warm_size=1)
+    contexts = {name: pool.checkout(name) for name in ("a", "b", "c")}
+    for name, ctx in contexts.items():
+        await pool.checkin(name, ctx)
+
+    # "a" was evicted to the warm pool, the others are still pooled
+    assert pool.checkout("b") is contexts["b"]
+    assert pool.checkout("c") is contexts["c"]
+    assert pool.checkout("a") is contexts["a"]
+
+
+async def test_context_pool_drops_contexts_when_warm_pool_is_full(agent):
+    pool = worker.ContextPool(agent, warm_size=1)
+    first, second = pool.checkout(None), pool.checkout(None)
+
+    await pool.checkin(None, first)
+    await pool.checkin(None, second)
+
+    assert pool.checkout(None) is first
+    assert pool.checkout(None) not in (first, second)
+
+
+async def test_context_pool_clears_chat_memory_on_checkin(agent):
+    pool = worker.ContextPool(agent)
+    ctx = pool.checkout("conv-1")
+    memory = ChatMemoryBuffer.from_defaults()
+    await memory.aput(ChatMessage(role="user", content="weather in CA"))
+    await ctx.store.set("memory", memory)
+
+    await pool.checkin("conv-1", ctx)
+
+    assert await (await ctx.store.get("memory")).aget_all() == []
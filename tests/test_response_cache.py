@@ -0,0 +1,176 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from demo.shared import response_cache
+from demo.shared.response_cache import ResponseCache, SemanticResponseCache
+
+
+def counting(response="sunny", cacheable=True, delay=0.0):
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        await asyncio.sleep(delay)
+        return response, cacheable
+
+    return compute, calls
+
+
+async def test_cacheable_response_is_stored():
+    cache = ResponseCache("model|prompt")
+    compute, calls = counting()
+
+    assert await cache.get_or_compute("weather in CA", compute) == "sunny"
+    assert await cache.get_or_compute("weather in CA", compute) == "sunny"
+    assert cache.get("weather in CA") == "sunny"
+    assert len(calls) == 1
+
+
+async def test_uncacheable_response_is_recomputed():
+    cache = ResponseCache("model|prompt")
+    compute, calls = counting(cacheable=False)
+
+    assert await cache.get_or_compute("weather in CA", compute) == "sunny"
+    assert await cache.get_or_compute("weather in CA", compute) == "sunny"
+    assert cache.get("weather in CA") is None
+    assert len(calls) == 2
+
+
+async def test_namespace_separates_keys():
+    assert ResponseCache("a").key("q") != ResponseCache("b").key("q")
+    assert ResponseCache("a").key("q") == ResponseCache(b"a").key("q")
+
+
+@pytest.mark.parametrize("cacheable", [True, False])
+async def test_concurrent_misses_share_one_computation(cacheable):
+    cache = ResponseCache("model|prompt")
+    compute, calls = counting(cacheable=cacheable, delay=0.05)
+
+    responses = await asyncio.gather(
+        *(cache.get_or_compute("weather in CA", compute) for _ in range(5))
+    )
+
+    assert responses == ["sunny"] * 5
+    assert len(calls) == 1
+    assert not cache._inflight
+
+
+async def test_distinct_queries_compute_in_parallel():
+    cache = ResponseCache("model|prompt")
+    compute, calls = counting(delay=0.2)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.gather(*(cache.get_or_compute(f"query {i}", compute) for i in range(5)))
+
+    assert len(calls) == 5
+    assert loop.time() - started < 0.5
+
+
+async def test_failure_is_shared_and_not_stored():
+    cache = ResponseCache("model|prompt")
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute("weather in CA", compute) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(calls) == 1
+    assert cache.get("weather in CA") is None
+    assert not cache._inflight
+
+
+async def test_cancelled_waiter_does_not_cancel_others():
+    cache = ResponseCache("model|prompt")
+    compute, calls = counting(delay=0.1)
+
+    first = asyncio.create_task(cache.get_or_compute("weather in CA", compute))
+    second = asyncio.create_task(cache.get_or_compute("weather in CA", compute))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "sunny"
+    assert first.cancelled()
+    assert len(calls) == 1
+    assert cache.get("weather in CA") == "sunny"
+
+
+async def test_computation_cancelled_when_all_waiters_leave():
+    cache = ResponseCache("model|prompt")
+    finished = []
+
+    async def compute():
+        await asyncio.sleep(0.1)
+        finished.append(None)
+        return "sunny", True
+
+    waiters = [
+        asyncio.create_task(cache.get_or_compute("weather in CA", compute)) for _ in range(2)
+    ]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.sleep(0.15)
+
+    assert not finished
+    assert not cache._inflight
+    assert cache.get("weather in CA") is None
+
+
+class FakeEmbedding:
+    """Maps each query to a fixed vector; unknown queries are orthogonal to all."""
+
+    dimension = 3
+    vectors = {
+        "weather in Indiana": [1.0, 0.0, 0.0],
+        "Indiana weather": [1.0, 0.01, 0.0],
+        "forecast for Denver": [0.0, 1.0, 0.0],
+    }
+
+    def to_embeddings(self, text, **_):
+        return np.array(self.vectors.get(text, [0.0, 0.0, 1.0]), dtype="float32")
+
+
+@pytest.fixture
+def semantic_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, "Onnx", FakeEmbedding)
+    cache = SemanticResponseCache(str(tmp_path), "model|prompt", ttl=60)
+    cache.init()
+    return cache
+
+
+async def test_semantic_cache_matches_similar_query(semantic_cache):
+    await semantic_cache.put("weather in Indiana", "no alerts")
+
+    assert await semantic_cache.get("Indiana weather") == "no alerts"
+    assert await semantic_cache.get("forecast for Denver") is None
+
+
+async def test_semantic_cache_evicts_expired_entries(semantic_cache, monkeypatch):
+    await semantic_cache.put("weather in Indiana", "old")
+    now = response_cache.time.time()
+    monkeypatch.setattr(response_cache.time, "time", lambda: now + 120)
+
+    assert await semantic_cache.get("Indiana weather") is None
+    assert semantic_cache._cache.data_manager.v.count() == 0
+
+    await semantic_cache.put("weather in Indiana", "new")
+    assert await semantic_cache.get("Indiana weather") == "new"
+
+
+def test_semantic_cache_namespaces_data_dir(tmp_path):
+    a = SemanticResponseCache(str(tmp_path), "model-a|prompt")
+    b = SemanticResponseCache(str(tmp_path), "model-b|prompt")
+
+    assert a.data_dir != b.data_dir
+    assert os.path.dirname(a.data_dir) == str(tmp_path)